@@ -0,0 +1,147 @@
+"""
+Compare the legacy and structured Gemini sentiment prompts.
+
+Record real replies once (needs GEMINI_API_KEY):
+    python -m benchmarks.sentiment_prompt_bench --record
+
+Replay offline (no API key needed). This checks the parser against the
+committed reply cases, then reports parse-failure rate, tokens per request
+and end-to-end latency for each mode from the recordings, if present:
+    python -m benchmarks.sentiment_prompt_bench
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+import google.generativeai as genai
+
+from utils.gemini_sentiment import (
+    MODEL,
+    SENTIMENT_MODES,
+    build_sentiment_prompt,
+    parse_sentiment_response,
+    sentiment_generation_config,
+    setup_gemini,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+TEXTS_FILE = os.path.join(FIXTURES_DIR, "sentiment_texts.json")
+RECORDINGS_FILE = os.path.join(FIXTURES_DIR, "gemini_sentiment_recordings.json")
+CASES_FILE = os.path.join(FIXTURES_DIR, "sentiment_reply_cases.json")
+MODES = SENTIMENT_MODES
+
+
+def record(texts_file, recordings_file):
+    """Call Gemini for every fixture text in both modes and save the raw replies"""
+    if not setup_gemini():
+        raise SystemExit("GEMINI_API_KEY is required to record fixtures")
+
+    with open(texts_file) as f:
+        texts = json.load(f)
+
+    model = genai.GenerativeModel(MODEL)
+    recordings = []
+    for mode in MODES:
+        for text in texts:
+            start = time.perf_counter()
+            response = model.generate_content(
+                build_sentiment_prompt(text, mode),
+                generation_config=sentiment_generation_config(mode)
+            )
+            latency_ms = (time.perf_counter() - start) * 1000
+            try:
+                response_text = response.text
+            except ValueError as e:
+                # Blocked or empty candidates have no text; keep them as parse failures
+                print(f"No text for [{mode}] {text!r}: {e}")
+                response_text = ""
+            usage = response.usage_metadata
+            recordings.append({
+                "mode": mode,
+                "text": text,
+                "response_text": response_text,
+                "prompt_tokens": usage.prompt_token_count,
+                "output_tokens": usage.candidates_token_count,
+                "latency_ms": round(latency_ms, 1)
+            })
+
+    with open(recordings_file, "w") as f:
+        json.dump(recordings, f, indent=4)
+    print(f"Recorded {len(recordings)} replies to {recordings_file}")
+
+
+def check_cases(cases_file):
+    """
+    Run the parser over hand-written reply strings with known expected results.
+
+    Returns:
+        Number of cases where the parser disagreed with the expected result
+    """
+    with open(cases_file) as f:
+        cases = json.load(f)
+
+    mismatches = 0
+    for case in cases:
+        result = parse_sentiment_response(case["response_text"], case["mode"])
+        if result != case["expected"]:
+            mismatches += 1
+            print(f"MISMATCH [{case['mode']}] {case['response_text']!r}: expected {case['expected']}, got {result}")
+    print(f"Parser cases: {len(cases) - mismatches}/{len(cases)} as expected")
+    return mismatches
+
+
+def replay(recordings_file):
+    """Parse the recorded replies and summarise each mode"""
+    if not os.path.exists(recordings_file):
+        print(f"No recordings at {recordings_file}; run with --record to measure tokens and latency")
+        return
+
+    with open(recordings_file) as f:
+        recordings = json.load(f)
+
+    print(f"{'mode':<12}{'n':>4}{'parse fail':>12}{'prompt tok':>12}{'output tok':>12}{'latency ms':>12}{'p95 ms':>10}")
+    for mode in MODES:
+        entries = [entry for entry in recordings if entry["mode"] == mode]
+        if not entries:
+            continue
+
+        failures = 0
+        latencies = []
+        for entry in entries:
+            start = time.perf_counter()
+            if parse_sentiment_response(entry["response_text"], mode) is None:
+                failures += 1
+            # End-to-end = recorded API round trip + local parse time
+            latencies.append(entry["latency_ms"] + (time.perf_counter() - start) * 1000)
+
+        p95 = sorted(latencies)[max(0, int(round(0.95 * len(latencies))) - 1)]
+        print(
+            f"{mode:<12}{len(entries):>4}"
+            f"{failures / len(entries):>12.1%}"
+            f"{statistics.mean(entry['prompt_tokens'] for entry in entries):>12.1f}"
+            f"{statistics.mean(entry['output_tokens'] for entry in entries):>12.1f}"
+            f"{statistics.mean(latencies):>12.1f}"
+            f"{p95:>10.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Gemini sentiment prompt modes")
+    parser.add_argument("--record", action="store_true", help="call Gemini and save new recordings")
+    parser.add_argument("--texts", default=TEXTS_FILE)
+    parser.add_argument("--recordings", default=RECORDINGS_FILE)
+    parser.add_argument("--cases", default=CASES_FILE)
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.texts, args.recordings)
+    mismatches = check_cases(args.cases)
+    replay(args.recordings)
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pandas as pd
+
+# Custom Modules
+from utils.gemini_helper import get_ai_response
+from utils.gemini_sentiment import analyze_sentiment
+from utils.mood_tracker import save_mood, get_mood_history
+
+# Server Configuration
+HOST = os.environ.get("MINDFUL_HOST", "127.0.0.1")
+PORT = int(os.environ.get("MINDFUL_PORT", "8000"))
+WORKERS = int(os.environ.get("MINDFUL_WORKERS", "8"))
+KEEP_ALIVE_TIMEOUT = 15  # Seconds an idle connection is kept open
+MAX_BODY_BYTES = 1024 * 1024
+MAX_HEADERS = 100
+
+# mood_data.csv is rewritten on every save, so writes must not interleave
+_mood_lock = threading.Lock()
+
+
+class RequestError(Exception):
+    """Raised when a request or its payload is invalid"""
+
+    def __init__(self, message, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+def _require_text(payload, key):
+    value = payload.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise RequestError(f"'{key}' must be a non-empty string")
+    return value
+
+
+def handle_chat(payload):
+    """
+    Run one chat turn: score the latest user message, then ask Gemini for a reply.
+
+    Args:
+        payload: {"messages": [{"role": ..., "content": ...}, ...]}
+
+    Returns:
+        Dictionary with the assistant response and the sentiment used
+    """
+    messages = payload.get("messages")
+    if not isinstance(messages, list) or not messages:
+        raise RequestError("'messages' must be a non-empty list")
+    for message in messages:
+        if (not isinstance(message, dict)
+                or message.get("role") not in ("user", "assistant")
+                or not isinstance(message.get("content"), str)):
+            raise RequestError("each message needs a 'role' (user/assistant) and string 'content'")
+    if messages[-1]["role"] != "user":
+        raise RequestError("the last message must come from the user")
+
+    sentiment = analyze_sentiment(messages[-1]["content"])
+    response = get_ai_response(messages, sentiment)
+    return {"response": response, "sentiment": sentiment}
+
+
+def handle_sentiment(payload):
+    """Analyze the sentiment of payload["text"]"""
+    return analyze_sentiment(_require_text(payload, "text"))
+
+
+def handle_save_mood(payload):
+    """Save a mood entry from payload["mood_score"], ["mood_label"] and optional ["notes"]"""
+    mood_score = payload.get("mood_score")
+    if isinstance(mood_score, bool) or not isinstance(mood_score, int) or not 1 <= mood_score <= 5:
+        raise RequestError("'mood_score' must be an integer from 1 to 5")
+    mood_label = _require_text(payload, "mood_label")
+    notes = payload.get("notes", "")
+    if not isinstance(notes, str):
+        raise RequestError("'notes' must be a string")
+
+    with _mood_lock:
+        save_mood(mood_score, mood_label, notes)
+    return {"status": "saved"}
+
+
+def handle_mood_history(payload):
+    """Return all mood entries, oldest first"""
+    with _mood_lock:
+        mood_data = get_mood_history()
+    if mood_data is None or mood_data.empty:
+        return {"entries": []}
+
+    # A row with a missing or non-numeric score can't be charted or encoded; skip it
+    mood_data = mood_data.assign(mood_score=pd.to_numeric(mood_data["mood_score"], errors="coerce"))
+    mood_data = mood_data.dropna(subset=["mood_score"])
+    if mood_data.empty:
+        return {"entries": []}
+    mood_data["mood_score"] = mood_data["mood_score"].astype(int)
+
+    mood_data = mood_data.sort_values("timestamp")
+    mood_data["timestamp"] = mood_data["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    mood_data["date"] = mood_data["date"].dt.strftime("%Y-%m-%d")
+    for column in ("mood_label", "notes"):
+        mood_data[column] = mood_data[column].fillna("").astype(str)
+    return {"entries": mood_data.to_dict(orient="records")}
+
+
+ROUTES = {
+    ("POST", "/chat"): handle_chat,
+    ("POST", "/sentiment"): handle_sentiment,
+    ("POST", "/mood"): handle_save_mood,
+    ("GET", "/mood"): handle_mood_history,
+    ("GET", "/health"): lambda payload: {"status": "ok"},
+}
+
+
+class MindfulServer:
+    """
+    Headless HTTP/1.1 JSON API over the chat and mood pipeline.
+
+    Connections are kept alive between requests; the blocking Gemini, NLTK
+    and CSV calls run on a thread pool so the event loop stays responsive.
+    """
+
+    def __init__(self, host=HOST, port=PORT, workers=WORKERS):
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mindful-worker")
+        self.server = None
+        self._connections = set()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Report the real port when started with port=0
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            # Idle keep-alive connections would otherwise hold wait_closed() (3.12.1+) open
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    # The timeout covers the whole request, so a slow client can't hold the connection
+                    request = await asyncio.wait_for(self._read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                except RequestError as e:
+                    # The stream can't be trusted after a protocol error, so answer and close
+                    self._write_response(writer, e.status, {"error": str(e)}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                method, path, body, keep_alive = request
+                status, result = await self._dispatch(method, path, body)
+                self._write_response(writer, status, result, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # CancelledError comes from close(); end the connection quietly
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+
+    @staticmethod
+    async def _readline(reader):
+        try:
+            return await reader.readline()
+        except ValueError:
+            # readline raises ValueError when a line exceeds the stream buffer limit
+            raise RequestError("request line or header too large", HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+
+    async def _read_request(self, reader):
+        """
+        Read one request from the connection.
+
+        Returns:
+            (method, path, body, keep_alive), or None if the client closed the connection
+        """
+        request_line = await self._readline(reader)
+        if not request_line:
+            return None
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise RequestError("malformed request line")
+
+        headers = {}
+        header_count = 0
+        while True:
+            line = await self._readline(reader)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            header_count += 1
+            if header_count > MAX_HEADERS:
+                raise RequestError("too many headers", HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "transfer-encoding" in headers:
+            raise RequestError("Transfer-Encoding is not supported; send a Content-Length body", HTTPStatus.NOT_IMPLEMENTED)
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.1":
+            keep_alive = connection != "close"
+        else:
+            keep_alive = connection == "keep-alive"
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            length = -1
+        if length < 0 or length > MAX_BODY_BYTES:
+            raise RequestError("invalid Content-Length")
+        body = await reader.readexactly(length) if length else b""
+
+        return method, target.split("?", 1)[0], body, keep_alive
+
+    async def _dispatch(self, method, path, body):
+        handler = ROUTES.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in ROUTES):
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} not allowed on {path}"}
+            return HTTPStatus.NOT_FOUND, {"error": f"no route for {path}"}
+
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"error": "body must be valid JSON"}
+        if not isinstance(payload, dict):
+            return HTTPStatus.BAD_REQUEST, {"error": "body must be a JSON object"}
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self.executor, handler, payload)
+        except RequestError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+        status = HTTPStatus.CREATED if method == "POST" and path == "/mood" else HTTPStatus.OK
+        return status, result
+
+    @staticmethod
+    def _write_response(writer, status, result, keep_alive):
+        try:
+            body = json.dumps(result, allow_nan=False).encode("utf-8")
+        except ValueError:
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+            body = json.dumps({"error": "response contained a non-finite number"}).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        )
+        if keep_alive:
+            head += f"Keep-Alive: timeout={KEEP_ALIVE_TIMEOUT}\r\n"
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+
+
+async def run_server(host=HOST, port=PORT, workers=WORKERS):
+    server = await MindfulServer(host, port, workers).start()
+    print(f"Mindful Companion API listening on http://{server.host}:{server.port}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Mindful Companion as a headless JSON API")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_server(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
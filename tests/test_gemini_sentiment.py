@@ -0,0 +1,53 @@
+import json
+import os
+
+import pytest
+
+from utils import gemini_sentiment
+from utils.gemini_sentiment import analyze_sentiment, build_sentiment_prompt, parse_sentiment_response
+
+CASES_FILE = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures", "sentiment_reply_cases.json")
+
+with open(CASES_FILE) as f:
+    REPLY_CASES = json.load(f)
+
+
+@pytest.mark.parametrize("case", REPLY_CASES, ids=lambda case: f"{case['mode']}:{case['response_text'][:30]!r}")
+def test_parse_recorded_replies(case):
+    assert parse_sentiment_response(case["response_text"], case["mode"]) == case["expected"]
+
+
+def test_structured_prompt_keeps_non_ascii_text():
+    prompt = build_sentiment_prompt("Je suis très fatigué 😢 我很难过", "structured")
+    assert '"Je suis très fatigué 😢 我很难过"' in prompt
+    assert "\\u" not in prompt
+
+
+class FakeModel:
+    reply = ""
+
+    def __init__(self, name):
+        pass
+
+    def generate_content(self, prompt, generation_config=None):
+        return type("Response", (), {"text": FakeModel.reply})()
+
+
+@pytest.fixture
+def gemini_only(monkeypatch):
+    monkeypatch.setattr(gemini_sentiment, "NLTK_AVAILABLE", False)
+    monkeypatch.setattr(gemini_sentiment, "setup_gemini", lambda: True)
+    monkeypatch.setattr(gemini_sentiment.genai, "GenerativeModel", FakeModel)
+
+
+def test_unparseable_structured_reply_returns_low_confidence_default(gemini_only, monkeypatch):
+    monkeypatch.setattr(gemini_sentiment, "SENTIMENT_MODE", "structured")
+    # Truncated by max_output_tokens
+    FakeModel.reply = '{"s":4,"l":"hap'
+    assert analyze_sentiment("great day") == {'sentiment_score': 3, 'sentiment_label': 'neutral', 'confidence': 0.1}
+
+
+def test_unparseable_legacy_reply_falls_back_to_keywords(gemini_only, monkeypatch):
+    monkeypatch.setattr(gemini_sentiment, "SENTIMENT_MODE", "legacy")
+    FakeModel.reply = "Overall the text feels positive."
+    assert analyze_sentiment("great day") == {'sentiment_score': 4, 'sentiment_label': 'happy', 'confidence': 0.7}
@@ -0,0 +1,212 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+
+import server
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    """Replace the Gemini, NLTK and CSV calls with in-memory stand-ins"""
+    saved = []
+    monkeypatch.setattr(server, "analyze_sentiment",
+                        lambda text: {"sentiment_score": 2, "sentiment_label": "sad", "confidence": 0.9})
+    monkeypatch.setattr(server, "get_ai_response", lambda messages, sentiment: f"echo: {messages[-1]['content']}")
+    monkeypatch.setattr(server, "save_mood", lambda *args: saved.append(args))
+    monkeypatch.setattr(server, "get_mood_history", lambda: pd.DataFrame({
+        "timestamp": pd.to_datetime(["2025-04-28 14:44:41", "2025-04-28 14:44:27", "2025-04-29 09:00:00"]),
+        "date": pd.to_datetime(["2025-04-28", "2025-04-28", "2025-04-29"]),
+        # The last row mimics a CSV line with an empty mood_score
+        "mood_score": [3, 5, None],
+        "mood_label": [None, "happy", "sad"],
+        "notes": ["was a mid day", None, "score missing"],
+    }))
+    return saved
+
+
+def request_bytes(method, path, payload=None, headers=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n"
+    for name, value in (headers or {}).items():
+        head += f"{name}: {value}\r\n"
+    return head.encode() + b"\r\n" + body
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        return None
+    headers = {}
+    while (line := await reader.readline()) != b"\r\n":
+        name, _, value = line.decode().partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers["content-length"]))
+    return int(status_line.split()[1]), headers, json.loads(body)
+
+
+def exchange(raw_requests, expected_responses):
+    """Start a server, send the raw bytes on one connection and read the responses"""
+    async def run():
+        mindful = await server.MindfulServer("127.0.0.1", 0, workers=2).start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", mindful.port)
+            writer.write(b"".join(raw_requests))
+            await writer.drain()
+            responses = [await read_response(reader) for _ in range(expected_responses)]
+            # Any extra data (or EOF) tells us whether the server closed the connection
+            trailing = await asyncio.wait_for(reader.read(), 5) if responses[-1][1]["connection"] == "close" else None
+            writer.close()
+            await writer.wait_closed()
+            return responses, trailing
+        finally:
+            await mindful.close()
+
+    return asyncio.run(run())
+
+
+def call(method, path, payload=None, headers=None):
+    responses, _ = exchange([request_bytes(method, path, payload, headers)], 1)
+    return responses[0]
+
+
+def test_chat_turn(stubs):
+    status, _, body = call("POST", "/chat", {"messages": [{"role": "user", "content": "hello"}]})
+    assert status == 200
+    assert body["response"] == "echo: hello"
+    assert body["sentiment"]["sentiment_label"] == "sad"
+
+
+def test_sentiment(stubs):
+    status, _, body = call("POST", "/sentiment", {"text": "I feel down"})
+    assert status == 200
+    assert body == {"sentiment_score": 2, "sentiment_label": "sad", "confidence": 0.9}
+
+
+def test_save_mood(stubs):
+    status, _, body = call("POST", "/mood", {"mood_score": 4, "mood_label": "happy", "notes": "good day"})
+    assert status == 201
+    assert body == {"status": "saved"}
+    assert stubs == [(4, "happy", "good day")]
+
+
+def test_mood_history_skips_bad_rows_and_fills_missing_text(stubs):
+    status, _, body = call("GET", "/mood")
+    assert status == 200
+    assert body["entries"] == [
+        {"timestamp": "2025-04-28 14:44:27", "date": "2025-04-28", "mood_score": 5, "mood_label": "happy", "notes": ""},
+        {"timestamp": "2025-04-28 14:44:41", "date": "2025-04-28", "mood_score": 3, "mood_label": "", "notes": "was a mid day"},
+    ]
+
+
+def test_health(stubs):
+    assert call("GET", "/health")[2] == {"status": "ok"}
+
+
+def test_unknown_route_and_wrong_method(stubs):
+    assert call("GET", "/missing")[0] == 404
+    assert call("DELETE", "/mood")[0] == 405
+
+
+@pytest.mark.parametrize("path, payload", [
+    ("/chat", {"messages": []}),
+    ("/chat", {"messages": [{"role": "assistant", "content": "hi"}]}),
+    ("/sentiment", {"text": "   "}),
+    ("/mood", {"mood_score": 6, "mood_label": "happy"}),
+    ("/mood", {"mood_score": True, "mood_label": "happy"}),
+    ("/mood", {"mood_score": 3, "mood_label": "ok", "notes": 5}),
+    ("/sentiment", ["not", "an", "object"]),
+])
+def test_validation_errors(stubs, path, payload):
+    status, headers, body = call("POST", path, payload)
+    assert status == 400
+    assert "error" in body
+    assert headers["connection"] == "keep-alive"
+    assert stubs == []
+
+
+def test_invalid_json_body(stubs):
+    raw = b"POST /sentiment HTTP/1.1\r\nContent-Length: 5\r\n\r\n{oops"
+    status, _, body = exchange([raw], 1)[0][0]
+    assert status == 400
+    assert body["error"] == "body must be valid JSON"
+
+
+def test_pipelined_requests_share_one_connection(stubs):
+    responses, _ = exchange([
+        request_bytes("POST", "/sentiment", {"text": "first"}),
+        request_bytes("GET", "/health"),
+    ], 2)
+    assert [status for status, _, _ in responses] == [200, 200]
+    assert all(headers["connection"] == "keep-alive" for _, headers, _ in responses)
+    assert responses[1][2] == {"status": "ok"}
+
+
+def test_connection_close_is_honoured(stubs):
+    responses, trailing = exchange([request_bytes("GET", "/health", headers={"Connection": "close"})], 1)
+    assert responses[0][1]["connection"] == "close"
+    assert trailing == b""
+
+
+def test_chunked_body_is_rejected(stubs):
+    raw = (b"POST /sentiment HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+           b"d\r\n{\"text\": \"hi\"}\r\n0\r\n\r\n")
+    responses, trailing = exchange([raw], 1)
+    assert responses[0][0] == 501
+    assert trailing == b""
+
+
+def test_oversized_header_is_rejected(stubs):
+    raw = b"GET /health HTTP/1.1\r\nX-Big: " + b"a" * (128 * 1024) + b"\r\n\r\n"
+    responses, trailing = exchange([raw], 1)
+    assert responses[0][0] == 431
+    assert trailing == b""
+
+
+def test_too_many_headers_is_rejected(stubs):
+    raw = b"GET /health HTTP/1.1\r\n" + b"X-Dup: 1\r\n" * (server.MAX_HEADERS + 1) + b"\r\n"
+    responses, _ = exchange([raw], 1)
+    assert responses[0][0] == 431
+
+
+def test_slow_headers_time_out(stubs, monkeypatch):
+    monkeypatch.setattr(server, "KEEP_ALIVE_TIMEOUT", 0.2)
+
+    async def run():
+        mindful = await server.MindfulServer("127.0.0.1", 0, workers=1).start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", mindful.port)
+            writer.write(b"GET /health HTTP/1.1\r\n")
+            try:
+                # Each header arrives well within the timeout, but the request as a whole doesn't
+                for _ in range(10):
+                    writer.write(b"X-Drip: 1\r\n")
+                    await writer.drain()
+                    await asyncio.sleep(0.1)
+            except ConnectionError:
+                return b""
+            closed = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return closed
+        finally:
+            await mindful.close()
+
+    assert asyncio.run(run()) == b""
+
+
+def test_close_drops_idle_keep_alive_connections(stubs):
+    async def run():
+        mindful = await server.MindfulServer("127.0.0.1", 0, workers=1).start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", mindful.port)
+        writer.write(request_bytes("GET", "/health"))
+        await writer.drain()
+        assert (await read_response(reader))[1]["connection"] == "keep-alive"
+
+        # The connection is now idle; shutdown must not wait for KEEP_ALIVE_TIMEOUT
+        await asyncio.wait_for(mindful.close(), 2)
+        closed = await asyncio.wait_for(reader.read(), 2)
+        writer.close()
+        return closed
+
+    assert asyncio.run(run()) == b""
@@ -1,5 +1,6 @@
 import os
 import json
+import math
 import nltk
 from nltk.sentiment import SentimentIntensityAnalyzer
 import google.generativeai as genai
@@ -25,6 +26,134 @@ def setup_gemini():
         return True
     return False
 
+# Gemini sentiment response format: "structured" asks for compact JSON,
+# "legacy" keeps the original free-text prompt (useful for comparison)
+SENTIMENT_MODES = ("legacy", "structured")
+SENTIMENT_MODE = os.environ.get("GEMINI_SENTIMENT_MODE", "structured")
+if SENTIMENT_MODE not in SENTIMENT_MODES:
+    raise ValueError(f"GEMINI_SENTIMENT_MODE must be one of {SENTIMENT_MODES}, got {SENTIMENT_MODE!r}")
+MODEL = "gemini-2.0-flash"
+SENTIMENT_LABELS = ("happy", "neutral", "sad")
+
+LEGACY_PROMPT = """Analyze the sentiment of the following text. Rate it on a scale of 1 to 5, where:
+            1 = Very negative
+            2 = Negative
+            3 = Neutral
+            4 = Positive
+            5 = Very positive
+            
+            Also provide a confidence score between 0 and 1, and one of these labels: happy, neutral, sad.
+            
+            Text to analyze: "{text}"
+            
+            Respond with this format (no need for JSON):
+            Sentiment score: [number 1-5]
+            Sentiment label: [happy/neutral/sad]
+            Confidence: [number between 0-1]
+            """
+
+# s = score 1-5, l = label, c = confidence 0-1
+STRUCTURED_PROMPT = 'Sentiment of the text as JSON {{"s":1-5,"l":"happy"|"neutral"|"sad","c":0-1}}.\nText: {text}'
+
+# Constrains Gemini's JSON output to the three fields the prompt asks for
+STRUCTURED_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "s": {"type": "integer"},
+        "l": {"type": "string", "format": "enum", "enum": list(SENTIMENT_LABELS)},
+        "c": {"type": "number"}
+    },
+    "required": ["s", "l", "c"]
+}
+
+def _reject_duplicate_keys(pairs):
+    keys = [key for key, _ in pairs]
+    if len(keys) != len(set(keys)):
+        raise ValueError("duplicate key in sentiment reply")
+    return dict(pairs)
+
+STRUCTURED_DECODER = json.JSONDecoder(object_pairs_hook=_reject_duplicate_keys)
+CODE_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*(.*?)\s*```\s*$', re.DOTALL)
+
+LEGACY_SCORE_RE = re.compile(r'Sentiment score: (\d+)')
+LEGACY_LABEL_RE = re.compile(r'Sentiment label: (\w+)')
+LEGACY_CONF_RE = re.compile(r'Confidence: (0\.\d+|1\.0|1)')
+
+def build_sentiment_prompt(text, mode=SENTIMENT_MODE):
+    """Build the Gemini sentiment prompt for the given response mode"""
+    if mode == "legacy":
+        return LEGACY_PROMPT.format(text=text)
+    # Keep non-ASCII text as-is; \uXXXX escapes cost extra tokens
+    return STRUCTURED_PROMPT.format(text=json.dumps(text, ensure_ascii=False))
+
+def sentiment_generation_config(mode=SENTIMENT_MODE):
+    """Generation settings for the given mode (structured mode forces short JSON output)"""
+    if mode == "legacy":
+        return None
+    return genai.GenerationConfig(
+        response_mime_type="application/json",
+        response_schema=STRUCTURED_SCHEMA,
+        temperature=0,
+        max_output_tokens=64
+    )
+
+def _is_number(value):
+    # JSON allows NaN/Infinity (and 1e999 overflows to inf), which int() can't convert
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def _parse_structured(response_text):
+    fenced = CODE_FENCE_RE.match(response_text)
+    if fenced:
+        response_text = fenced.group(1)
+    try:
+        reply = STRUCTURED_DECODER.decode(response_text.strip())
+    except ValueError:
+        return None
+    if not isinstance(reply, dict):
+        return None
+
+    sentiment_score, sentiment_label, confidence = reply.get('s'), reply.get('l'), reply.get('c')
+    # Reject out-of-range values rather than clamping them; they mean the model ignored the schema
+    if not _is_number(sentiment_score) or sentiment_score != int(sentiment_score) or not 1 <= sentiment_score <= 5:
+        return None
+    if sentiment_label not in SENTIMENT_LABELS:
+        return None
+    if not _is_number(confidence) or not 0 <= confidence <= 1:
+        return None
+
+    return {
+        'sentiment_score': int(sentiment_score),
+        'sentiment_label': sentiment_label,
+        'confidence': float(confidence)
+    }
+
+def parse_sentiment_response(response_text, mode=SENTIMENT_MODE):
+    """
+    Parse a Gemini sentiment reply.
+
+    Args:
+        response_text: Raw text returned by the model
+        mode: "structured" or "legacy"
+
+    Returns:
+        Dictionary with sentiment score, label, and confidence, or None if the reply doesn't match
+    """
+    if mode != "legacy":
+        return _parse_structured(response_text)
+
+    score_match = LEGACY_SCORE_RE.search(response_text)
+    label_match = LEGACY_LABEL_RE.search(response_text)
+    conf_match = LEGACY_CONF_RE.search(response_text)
+    if not (score_match and label_match and conf_match):
+        return None
+
+    # Ensure values are within allowed ranges
+    return {
+        'sentiment_score': max(1, min(5, int(score_match.group(1)))),
+        'sentiment_label': label_match.group(1).lower(),
+        'confidence': max(0, min(1, float(conf_match.group(1))))
+    }
+
 def analyze_sentiment(text):
     """
     Analyze the sentiment of the provided text.
@@ -73,63 +202,32 @@ def analyze_sentiment(text):
     # Fallback to Gemini if NLTK is unavailable or failed
     if setup_gemini():
         try:
-            # Configure the model
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            
-            # Create a simpler prompt for sentiment analysis
-            prompt = """Analyze the sentiment of the following text. Rate it on a scale of 1 to 5, where:
-            1 = Very negative
-            2 = Negative
-            3 = Neutral
-            4 = Positive
-            5 = Very positive
-            
-            Also provide a confidence score between 0 and 1, and one of these labels: happy, neutral, sad.
-            
-            Text to analyze: "{text}"
-            
-            Respond with this format (no need for JSON):
-            Sentiment score: [number 1-5]
-            Sentiment label: [happy/neutral/sad]
-            Confidence: [number between 0-1]
-            """
-            
-            response = model.generate_content(prompt.format(text=text))
+            model = genai.GenerativeModel(MODEL)
+            response = model.generate_content(
+                build_sentiment_prompt(text, SENTIMENT_MODE),
+                generation_config=sentiment_generation_config(SENTIMENT_MODE)
+            )
             response_text = response.text
-            
-            # Parse the response using regex
-            score_match = re.search(r'Sentiment score: (\d+)', response_text)
-            label_match = re.search(r'Sentiment label: (\w+)', response_text)
-            conf_match = re.search(r'Confidence: (0\.\d+|1\.0|1)', response_text)
-            
-            if score_match and label_match and conf_match:
-                sentiment_score = int(score_match.group(1))
-                sentiment_label = label_match.group(1).lower()
-                confidence = float(conf_match.group(1))
-                
-                # Ensure values are within allowed ranges
-                sentiment_score = max(1, min(5, sentiment_score))
-                confidence = max(0, min(1, confidence))
-                
-                return {
-                    'sentiment_score': sentiment_score,
-                    'sentiment_label': sentiment_label,
-                    'confidence': confidence
-                }
-            else:
-                # If we can't parse the response correctly, use basic heuristics
+
+            result = parse_sentiment_response(response_text, SENTIMENT_MODE)
+            if result is not None:
+                return result
+
+            # If we can't parse a free-text reply, use basic heuristics. A structured reply
+            # that fails validation (e.g. truncated JSON) falls through to the low-confidence default.
+            if SENTIMENT_MODE == "legacy":
                 if 'positive' in response_text.lower():
                     return {'sentiment_score': 4, 'sentiment_label': 'happy', 'confidence': 0.7}
                 elif 'negative' in response_text.lower():
                     return {'sentiment_score': 2, 'sentiment_label': 'sad', 'confidence': 0.7}
                 else:
                     return {'sentiment_score': 3, 'sentiment_label': 'neutral', 'confidence': 0.5}
-                
+
         except Exception as e:
             st.error(f"Gemini sentiment analysis error: {str(e)}")
             # If Gemini fails or is unavailable, return a neutral default
             pass
-    
+
     # Default neutral sentiment if all methods fail
     return {
         'sentiment_score': 3,